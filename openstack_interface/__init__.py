@@ -1,2 +1,7 @@
 # alias the import for easier access
-from .openstack_interface import OpenStackInterface
\ No newline at end of file
+from .openstack_interface import OpenStackInterface, TeardownResult
+from .federated_interface import FederatedOpenStackInterface, RegionResult
+from .fip_reaper import FloatingIPReaper
+from .inventory import InventoryExporter
+from .userdata import UserdataCache
+from .http_pool import HTTPPoolConfig
@@ -0,0 +1,354 @@
+import time
+import logging
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any
+
+from .openstack_interface import OpenStackInterface
+
+# Initialize logger for OpenStack Interface
+logger = logging.getLogger('cloudman.app.openstack')
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+@dataclass
+class RegionResult:
+    """
+    The outcome of a call made against a single region.
+    """
+    region_name : str
+    value : Any = None
+    error : Exception = None
+    latency : float = 0.0
+
+    @property
+    def ok(self):
+        return self.error is None
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class FederatedOpenStackInterface:
+    """
+    Holds one OpenStackInterface per cloud/region and fans read queries out
+    to all of them concurrently. A failure in one region is logged and
+    reported in its RegionResult; it never aborts the query in other regions.
+    """
+
+    def __init__(self,
+                 cloud_configs : dict,
+                 vm_setup_script_path : str = None,
+                 external_network_ids : dict = None,
+                 key_name : str = None,
+                 max_workers : int = None,
+                 http_pool_config = None):
+        """
+        Args:
+            cloud_configs (dict): region name -> cloud config (see OpenStackInterface).
+            external_network_ids (dict): region name -> external network ID.
+            max_workers (int): maximum number of concurrent region calls,
+                defaults to one per region.
+            http_pool_config (HTTPPoolConfig): connection pool settings used
+                by every region, each region gets its own pool.
+        """
+        if not cloud_configs:
+            raise ValueError("At least one cloud config must be provided to build a federated interface.")
+
+        logger.info(f"Initializing FederatedOpenStackInterface with regions: {list(cloud_configs)}")
+        external_network_ids = external_network_ids or {}
+
+        self.executor = ThreadPoolExecutor(max_workers=max_workers or len(cloud_configs),
+                                           thread_name_prefix='osi-region')
+
+        # last observed latency (seconds) of a call into each region
+        self.region_latency = {}
+
+        # initialize the regions concurrently, keeping the ones that come up
+        self.regions = {}
+        self.failed_regions = {}
+
+        def init_region(region_name):
+            return OpenStackInterface(vm_setup_script_path=vm_setup_script_path,
+                                      external_network_id=external_network_ids.get(region_name, None),
+                                      key_name=key_name,
+                                      cloud_config=cloud_configs[region_name],
+                                      http_pool_config=http_pool_config)
+
+        results = self._run({region_name: (init_region, (region_name,), {})
+                             for region_name in cloud_configs})
+
+        for region_name, result in results.items():
+            if result.ok:
+                self.regions[region_name] = result.value
+            else:
+                logger.error(f"Failed to initialize region {region_name}: {result.error}")
+                self.failed_regions[region_name] = result.error
+
+        if not self.regions:
+            self.executor.shutdown(wait=True)
+            raise ValueError("Failed to initialize any region of the federated interface.")
+
+        logger.info(f"FederatedOpenStackInterface initialized with {len(self.regions)} regions")
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def close(self):
+        """
+        Shut down the worker threads used for the fan-out.
+        """
+        self.executor.shutdown(wait=True)
+
+    def __enter__(self):
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+
+        self.close()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_region(self, region_name : str):
+        """
+        Get the OpenStackInterface of a single region.
+        """
+        if region_name not in self.regions:
+            raise ValueError(f"Region {region_name} is not available.")
+
+        return self.regions[region_name]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_region_latencies(self):
+        """
+        Get the last observed call latency (seconds) for each region.
+        """
+        return dict(self.region_latency)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _timed_call(self, region_name, func, args, kwargs):
+
+        start = time.perf_counter()
+        try:
+            value = func(*args, **kwargs)
+            error = None
+        except Exception as e:
+            value = None
+            error = e
+        latency = time.perf_counter() - start
+
+        self.region_latency[region_name] = latency
+        return RegionResult(region_name=region_name, value=value, error=error, latency=latency)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _run(self, calls : dict):
+        """
+        Run region name -> (func, args, kwargs) calls concurrently.
+        """
+        futures = {region_name: self.executor.submit(self._timed_call, region_name, func, args, kwargs)
+                   for region_name, (func, args, kwargs) in calls.items()}
+
+        results = {region_name: future.result() for region_name, future in futures.items()}
+
+        for result in results.values():
+            logger.debug(f"Region {result.region_name} answered in {result.latency:.3f}s")
+
+        return results
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def fan_out(self, method_name : str, *args, **kwargs):
+        """
+        Call an OpenStackInterface method in every region concurrently.
+
+        Returns:
+            dict of region name -> RegionResult.
+        """
+        logger.debug(f"Fanning out {method_name} to {len(self.regions)} regions")
+        results = self._run({region_name: (getattr(interface, method_name), args, kwargs)
+                             for region_name, interface in self.regions.items()})
+
+        for result in results.values():
+            if not result.ok:
+                logger.warning(f"{method_name} failed in region {result.region_name}: {result.error}")
+
+        return results
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_vm(self, vm_name=None):
+        """
+        Get a VM by its name from whichever region holds it.
+
+        Returns:
+            (region name, VM) tuple.
+
+        Raises:
+            ValueError if no region holds the VM. The message names the
+            regions whose lookup failed, in which case the VM may exist there.
+        """
+        if vm_name is None:
+            raise ValueError("VM name must be provided to get the VM.")
+
+        results = self.fan_out('get_vm', vm_name=vm_name)
+
+        for region_name, result in results.items():
+            if result.ok:
+                return region_name, result.value
+
+        # OpenStackInterface.get_vm raises ValueError when the VM is not
+        # found, any other error means the region could not be searched
+        failed = {region_name: result.error for region_name, result in results.items()
+                  if not isinstance(result.error, ValueError)}
+
+        if not failed:
+            error_msg = f"VM with name {vm_name} not found in any region."
+            logger.warning(error_msg)
+        elif len(failed) == len(results):
+            error_msg = f"Failed to look up VM {vm_name}, every region failed: {self._format_errors(failed)}"
+            logger.error(error_msg)
+        else:
+            error_msg = (f"VM with name {vm_name} not found in the regions that answered; "
+                         f"lookup failed in: {self._format_errors(failed)}")
+            logger.warning(error_msg)
+
+        raise ValueError(error_msg)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _format_errors(self, errors : dict):
+
+        return ', '.join(f"{region_name} ({type(error).__name__}: {error})"
+                         for region_name, error in errors.items())
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_vm_by_floating_ip(self,
+                              floating_ip_address : str):
+        """
+        Get a VM by its floating IP from whichever region holds it.
+
+        Returns:
+            (region name, VM) tuple, or None if no region holds the floating IP.
+        """
+        results = self.fan_out('get_vm_by_floating_ip', floating_ip_address=floating_ip_address)
+
+        for region_name, result in results.items():
+            if result.ok and result.value is not None:
+                return region_name, result.value
+
+        failed = {region_name: result.error for region_name, result in results.items() if not result.ok}
+        if failed:
+            logger.warning(f"No VM found with floating IP {floating_ip_address} in the regions that answered; "
+                           f"lookup failed in: {self._format_errors(failed)}")
+        else:
+            logger.warning(f"No VM found with floating IP {floating_ip_address} in any region")
+        return None
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_os_image_list(self):
+        """
+        Get the merged, de-duplicated list of image names across all regions.
+        """
+        results = self.fan_out('get_os_image_list')
+
+        image_names = set()
+        for result in results.values():
+            if result.ok:
+                image_names.update(result.value)
+
+        return sorted(image_names)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_flavor_list(self):
+        """
+        Get the list of flavors of each region.
+
+        Returns:
+            dict of region name -> list of flavors, for the regions that answered.
+        """
+        results = self.fan_out('get_flavor_list')
+
+        return {region_name: result.value for region_name, result in results.items() if result.ok}
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_projects(self):
+        """
+        Get the list of projects of each region.
+
+        Returns:
+            dict of region name -> list of projects, for the regions that answered.
+        """
+        results = self.fan_out('get_projects')
+
+        return {region_name: result.value for region_name, result in results.items() if result.ok}
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _get_region_load(self, interface):
+        """
+        Get the fraction of hypervisor vCPUs in use in a region.
+        """
+        stats = interface.nova_client.hypervisor_stats.statistics()
+        if not stats.vcpus:
+            return 1.0
+
+        return stats.vcpus_used / stats.vcpus
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_least_loaded_region(self):
+        """
+        Get the name of the region with the lowest hypervisor vCPU usage.
+        """
+        results = self._run({region_name: (self._get_region_load, (interface,), {})
+                             for region_name, interface in self.regions.items()})
+
+        loads = {}
+        for region_name, result in results.items():
+            if result.ok:
+                loads[region_name] = result.value
+            else:
+                logger.warning(f"Failed to get load of region {region_name}: {result.error}")
+
+        if not loads:
+            raise ValueError("Failed to get the load of any region.")
+
+        region_name = min(loads, key=loads.get)
+        logger.debug(f"Least loaded region: {region_name} ({loads[region_name]:.0%} vCPUs used)")
+        return region_name
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def create_vm(self,
+                  project_name : str,
+                  hostname : str,
+                  flavour,
+                  image,
+                  networks : list,
+                  region_name : str = None):
+        """
+        Create a VM in the given region, or in the least loaded region if
+        no region is given. The flavour, image and networks must be valid in
+        the chosen region (IDs or names shared by all regions work best).
+
+        Returns:
+            (region name, VM) tuple.
+        """
+        if region_name is None:
+            region_name = self.get_least_loaded_region()
+
+        logger.info(f"Routing creation of VM {hostname} to region {region_name}")
+        result = self._timed_call(region_name,
+                                  self.get_region(region_name).create_vm,
+                                  (project_name, hostname, flavour, image, networks),
+                                  {})
+        if not result.ok:
+            raise result.error
+
+        return region_name, result.value
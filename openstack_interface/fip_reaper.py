@@ -0,0 +1,169 @@
+import logging
+import threading
+
+from datetime import datetime, timezone
+
+# Initialize logger for OpenStack Interface
+logger = logging.getLogger('cloudman.app.openstack')
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+DEFAULT_REAP_INTERVAL = 300  # seconds
+
+# by default a floating IP must have been DOWN and unattached for this many
+# reap intervals before it is released
+DEFAULT_REAP_MIN_AGE_INTERVALS = 2
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class FloatingIPReaper:
+    """
+    Periodically releases DOWN floating IPs that are not attached to a port,
+    across all projects, on a background daemon thread. While a reaper is
+    running, OpenStackInterface skips the inline cleanup in _allocate_fip.
+
+    A freshly allocated floating IP is DOWN and unattached until it is
+    associated, so only floating IPs that have not changed for `min_age`
+    seconds are released. Floating IPs without timestamps are left alone.
+    """
+
+    def __init__(self,
+                 openstack_interface,
+                 interval : float = DEFAULT_REAP_INTERVAL,
+                 min_age : float = None):
+
+        if interval <= 0:
+            raise ValueError("Floating IP reaper interval must be greater than zero.")
+
+        self.openstack_interface = openstack_interface
+        self.interval = interval
+        self.min_age = min_age if min_age is not None else DEFAULT_REAP_MIN_AGE_INTERVALS * interval
+
+        self._stop_event = None
+        self._thread = None
+
+        # running totals, useful for monitoring
+        self.num_sweeps = 0
+        self.num_released = 0
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def is_running(self):
+
+        return self._thread is not None and self._thread.is_alive()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def start(self):
+        """
+        Start sweeping in the background. The first sweep runs immediately.
+        """
+        if self.is_running():
+            return
+
+        logger.info(f"Starting floating IP reaper with interval {self.interval}s")
+        # each thread gets its own event, so a thread that outlived a timed
+        # out stop() stays stopped
+        self._stop_event = threading.Event()
+        self._thread = threading.Thread(target=self._run,
+                                        args=(self._stop_event,),
+                                        name='osi-fip-reaper',
+                                        daemon=True)
+        self._thread.start()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def stop(self, timeout : float = None):
+        """
+        Stop the background sweeps and wait for the thread to exit.
+
+        Returns:
+            True if the thread has exited. If the join times out the thread
+            is still tracked and is_running() stays True until it exits.
+        """
+        if not self.is_running():
+            return True
+
+        logger.info("Stopping floating IP reaper")
+        self._stop_event.set()
+        self._thread.join(timeout)
+
+        if self._thread.is_alive():
+            logger.warning("Floating IP reaper did not stop before the timeout")
+            return False
+
+        self._thread = None
+        return True
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _run(self, stop_event):
+
+        while not stop_event.is_set():
+            try:
+                self.sweep()
+            except Exception as e:
+                # never let a failed sweep kill the reaper
+                logger.error(f"Floating IP reaper sweep failed: {str(e)}")
+
+            stop_event.wait(self.interval)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _get_age(self, fip, now):
+        """
+        Get the seconds since a floating IP was last created or updated, or
+        None if Neutron did not report either timestamp.
+        """
+        timestamps = []
+        for key in ('created_at', 'updated_at'):
+            value = fip.get(key)
+            if value:
+                timestamp = datetime.fromisoformat(value.replace('Z', '+00:00'))
+                if timestamp.tzinfo is None:
+                    timestamp = timestamp.replace(tzinfo=timezone.utc)
+                timestamps.append(timestamp)
+
+        if not timestamps:
+            return None
+
+        return (now - max(timestamps)).total_seconds()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def sweep(self):
+        """
+        Release every DOWN, unattached floating IP older than `min_age` once.
+
+        Returns:
+            The number of floating IPs released.
+        """
+        # snapshot the client, change_project rebinds the attribute; an admin
+        # session reaches the floating IPs of every project whatever its scope
+        neutron_client = self.openstack_interface.neutron_client
+        now = datetime.now(timezone.utc)
+
+        # filtering on status server side keeps the listing small
+        floating_ips = neutron_client.list_floatingips(status='DOWN')['floatingips']
+
+        num_released = 0
+        for fip in floating_ips:
+            if fip.get('port_id'):
+                continue
+
+            # a young floating IP may have just been allocated for an attach
+            age = self._get_age(fip, now)
+            if age is None or age < self.min_age:
+                continue
+
+            try:
+                self.openstack_interface._delete_fip(fip, neutron_client)
+                num_released += 1
+            except Exception as e:
+                logger.warning(f"Failed to release floating IP {fip.get('floating_ip_address')}: {str(e)}")
+
+        self.num_sweeps += 1
+        self.num_released += num_released
+        logger.debug(f"Floating IP reaper released {num_released} floating IPs")
+
+        return num_released
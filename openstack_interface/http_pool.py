@@ -0,0 +1,198 @@
+import time
+import socket
+import logging
+import threading
+
+from dataclasses import dataclass, field
+
+import requests
+
+from keystoneauth1 import session as keystone_session
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Initialize logger for OpenStack Interface
+logger = logging.getLogger('cloudman.app.openstack')
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+# service types used as keys of HTTPPoolConfig.service_timeouts
+COMPUTE_SERVICE = 'compute'
+NETWORK_SERVICE = 'network'
+IMAGE_SERVICE = 'image'
+IDENTITY_SERVICE = 'identity'
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+@dataclass
+class HTTPPoolConfig:
+    """
+    Connection pool settings of the HTTP session shared by the OpenStack
+    clients. Timeouts are in seconds, None means no timeout.
+    """
+    # number of per-host pools kept
+    pool_connections : int = 10
+    # connections kept open per host
+    pool_maxsize : int = 10
+    # wait for a free connection instead of opening one past pool_maxsize
+    pool_block : bool = False
+    # TCP keep-alive: idle time before probing, probe interval and count
+    keepalive_idle : int = 60
+    keepalive_interval : int = 15
+    keepalive_count : int = 4
+    connect_timeout : float = None
+    read_timeout : float = None
+    # service type -> read timeout, overrides read_timeout for that service
+    service_timeouts : dict = field(default_factory=dict)
+
+    def get_read_timeout(self, service_type : str):
+
+        return self.service_timeouts.get(service_type, self.read_timeout)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class HTTPPoolMetrics:
+    """
+    Thread-safe counters of how pooled connections are used.
+    """
+
+    def __init__(self):
+
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.checkouts = 0
+        self.reused = 0
+        self.waited = 0
+        self.wait_time = 0.0
+
+    def record_opened(self):
+
+        with self._lock:
+            self.opened += 1
+
+    def record_checkout(self, reused : bool, waited : bool, wait_time : float):
+
+        with self._lock:
+            self.checkouts += 1
+            if reused:
+                self.reused += 1
+            if waited:
+                self.waited += 1
+                self.wait_time += wait_time
+
+    def snapshot(self):
+
+        with self._lock:
+            return {'opened': self.opened,
+                    'checkouts': self.checkouts,
+                    'reused': self.reused,
+                    'waited': self.waited,
+                    'wait_time': self.wait_time}
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def _make_pool_class(base_pool_class, base_connection_class, metrics):
+    """
+    Build a urllib3 connection pool class that reports to `metrics`.
+    """
+
+    class MetricsConnection(base_connection_class):
+
+        def connect(self):
+            metrics.record_opened()
+            super().connect()
+
+    class MetricsConnectionPool(base_pool_class):
+
+        ConnectionCls = MetricsConnection
+
+        def _get_conn(self, timeout=None):
+            # in blocking mode an empty pool means waiting for a connection
+            # to be returned by another thread
+            waited = self.block and self.pool is not None and self.pool.empty()
+
+            start = time.perf_counter()
+            conn = super()._get_conn(timeout=timeout)
+            wait_time = time.perf_counter() - start
+
+            # a connection that still has its socket skips TCP and TLS setup
+            metrics.record_checkout(reused=getattr(conn, 'sock', None) is not None,
+                                    waited=waited,
+                                    wait_time=wait_time)
+            return conn
+
+    return MetricsConnectionPool
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class PooledKeepAliveAdapter(keystone_session.TCPKeepAliveAdapter):
+    """
+    keystoneauth's TCP keep-alive adapter with configurable pool sizes,
+    keep-alive timings and connect timeout, reporting to HTTPPoolMetrics.
+    """
+
+    def __init__(self,
+                 config : HTTPPoolConfig,
+                 metrics : HTTPPoolMetrics):
+
+        # HTTPAdapter keeps its own `config` attribute
+        self.pool_config = config
+        self.metrics = metrics
+        super().__init__(pool_connections=config.pool_connections,
+                         pool_maxsize=config.pool_maxsize,
+                         pool_block=config.pool_block)
+
+    def init_poolmanager(self, *args, **kwargs):
+
+        if 'socket_options' not in kwargs:
+            socket_options = [  (socket.IPPROTO_TCP, socket.TCP_NODELAY, 1),
+                                (socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+            # not every platform supports tuning the keep-alive probes
+            if hasattr(socket, 'TCP_KEEPIDLE'):
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, self.pool_config.keepalive_idle))
+            if hasattr(socket, 'TCP_KEEPINTVL'):
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, self.pool_config.keepalive_interval))
+            if hasattr(socket, 'TCP_KEEPCNT'):
+                socket_options.append((socket.IPPROTO_TCP, socket.TCP_KEEPCNT, self.pool_config.keepalive_count))
+            kwargs['socket_options'] = socket_options
+
+        super().init_poolmanager(*args, **kwargs)
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': _make_pool_class(HTTPConnectionPool, HTTPConnection, self.metrics),
+            'https': _make_pool_class(HTTPSConnectionPool, HTTPSConnection, self.metrics)}
+
+    def send(self, request, timeout=None, **kwargs):
+
+        # the read timeout comes from the keystone session of each service,
+        # the connect timeout is the same for all of them
+        if self.pool_config.connect_timeout is not None and not isinstance(timeout, tuple):
+            timeout = (self.pool_config.connect_timeout, timeout)
+
+        return super().send(request, timeout=timeout, **kwargs)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class HTTPPool:
+    """
+    A requests session with a PooledKeepAliveAdapter mounted. It outlives
+    the keystone sessions built on top of it, so connections, and the TLS
+    handshakes already done on them, are kept across change_project calls.
+    """
+
+    def __init__(self, config : HTTPPoolConfig = None):
+
+        self.config = config if config is not None else HTTPPoolConfig()
+        self.metrics = HTTPPoolMetrics()
+
+        self.session = requests.Session()
+        adapter = PooledKeepAliveAdapter(self.config, self.metrics)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        logger.debug(f"HTTP pool initialized: {self.config.pool_maxsize} connections per host, "
+                     f"block={self.config.pool_block}")
+
+    def close(self):
+
+        self.session.close()
@@ -0,0 +1,361 @@
+import os
+import json
+import logging
+
+from .openstack_interface import DEFAULT_PAGE_SIZE
+
+# Initialize logger for OpenStack Interface
+logger = logging.getLogger('cloudman.app.openstack')
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+EXPORT_FORMATS = ['jsonl', 'parquet']
+
+# number of records buffered per Parquet row group
+PARQUET_BATCH_SIZE = 1000
+
+# (field name, type) of each exported record, the types are used to build
+# the Parquet schema and are one of 'string', 'int' or 'list'
+SERVER_FIELDS = [   ('id', 'string'),
+                    ('name', 'string'),
+                    ('status', 'string'),
+                    ('project_id', 'string'),
+                    ('project_name', 'string'),
+                    ('user_id', 'string'),
+                    ('flavor_id', 'string'),
+                    ('flavor_name', 'string'),
+                    ('vcpus', 'int'),
+                    ('ram_mb', 'int'),
+                    ('disk_gb', 'int'),
+                    ('gpu_type', 'string'),
+                    ('image_id', 'string'),
+                    ('hypervisor', 'string'),
+                    ('fixed_ips', 'list'),
+                    ('floating_ips', 'list'),
+                    ('created', 'string')]
+
+FLOATING_IP_FIELDS = [  ('id', 'string'),
+                        ('floating_ip_address', 'string'),
+                        ('status', 'string'),
+                        ('port_id', 'string'),
+                        ('fixed_ip_address', 'string'),
+                        ('project_id', 'string'),
+                        ('project_name', 'string')]
+
+IMAGE_FIELDS = [('id', 'string'),
+                ('name', 'string'),
+                ('status', 'string'),
+                ('visibility', 'string'),
+                ('owner', 'string'),
+                ('owner_name', 'string'),
+                ('size', 'int'),
+                ('disk_format', 'string'),
+                ('created_at', 'string')]
+
+FLAVOR_FIELDS = [   ('id', 'string'),
+                    ('name', 'string'),
+                    ('vcpus', 'int'),
+                    ('ram_mb', 'int'),
+                    ('disk_gb', 'int'),
+                    ('gpu_type', 'string')]
+
+PROJECT_FIELDS = [  ('id', 'string'),
+                    ('name', 'string'),
+                    ('domain_id', 'string'),
+                    ('enabled', 'string')]
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class JsonlWriter:
+    """
+    Writes one JSON record per line as records arrive.
+    """
+
+    def __init__(self, path : str, fields : list):
+
+        self.path = path
+        self.fields = [name for name, _ in fields]
+        self.num_records = 0
+        self._file = open(path, 'w')
+
+    def write(self, record : dict):
+
+        self._file.write(json.dumps({name: record.get(name) for name in self.fields}))
+        self._file.write('\n')
+        self.num_records += 1
+
+    def close(self):
+
+        self._file.close()
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class ParquetWriter:
+    """
+    Writes records to a Parquet file one row group of `batch_size` records at
+    a time, so at most one batch is held in memory. Requires pyarrow.
+    """
+
+    def __init__(self,
+                 path : str,
+                 fields : list,
+                 batch_size : int = PARQUET_BATCH_SIZE):
+
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Parquet export requires pyarrow, "
+                              "install it with: pip install OpenStackInterface[parquet]") from e
+
+        self._pa = pyarrow
+        types = {'string': pyarrow.string(),
+                 'int': pyarrow.int64(),
+                 'list': pyarrow.list_(pyarrow.string())}
+
+        self.path = path
+        self.fields = [name for name, _ in fields]
+        self.schema = pyarrow.schema([(name, types[field_type]) for name, field_type in fields])
+        self.batch_size = batch_size
+        self.num_records = 0
+
+        self._batch = []
+        self._writer = pyarrow.parquet.ParquetWriter(path, self.schema)
+
+    def write(self, record : dict):
+
+        self._batch.append({name: record.get(name) for name in self.fields})
+        self.num_records += 1
+
+        if len(self._batch) >= self.batch_size:
+            self._flush()
+
+    def _flush(self):
+
+        if self._batch:
+            self._writer.write_table(self._pa.Table.from_pylist(self._batch, schema=self.schema))
+            self._batch = []
+
+    def close(self):
+
+        self._flush()
+        self._writer.close()
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class InventoryExporter:
+    """
+    Streams a cloud-wide inventory of servers, floating IPs, images, flavors
+    and projects out of Nova, Neutron, Glance and Keystone. Servers are joined
+    to their project name, flavor, floating IPs and hypervisor host as they
+    are read, and only the small project and flavor lookup tables and the
+    aggregates are kept in memory.
+    """
+
+    def __init__(self,
+                 openstack_interface,
+                 page_size : int = DEFAULT_PAGE_SIZE):
+
+        self.openstack_interface = openstack_interface
+        self.page_size = page_size
+
+        self._project_names = None
+        self._flavors = None
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _get_project_names(self):
+
+        if self._project_names is None:
+            self._project_names = {project.id: project.name
+                                   for project in self.openstack_interface.get_projects()}
+
+        return self._project_names
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _get_flavors(self):
+
+        if self._flavors is None:
+            self._flavors = {flavor.id: flavor
+                             for flavor in self.openstack_interface.iter_flavors(page_size=self.page_size)}
+
+        return self._flavors
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _server_record(self, server):
+
+        project_names = self._get_project_names()
+        flavor_id = (getattr(server, 'flavor', None) or {}).get('id')
+        flavor = self._get_flavors().get(flavor_id)
+        image = getattr(server, 'image', None)
+
+        fixed_ips = []
+        floating_ips = []
+        for network in (getattr(server, 'addresses', None) or {}).values():
+            for addr in network:
+                if addr.get('OS-EXT-IPS:type') == 'floating':
+                    floating_ips.append(addr.get('addr'))
+                else:
+                    fixed_ips.append(addr.get('addr'))
+
+        # this removes the domain part of the hypervisor name (.maas)
+        hypervisor = getattr(server, 'OS-EXT-SRV-ATTR:host', None)
+        hypervisor = hypervisor.split('.')[0] if hypervisor else None
+
+        return {'id': server.id,
+                'name': server.name,
+                'status': server.status,
+                'project_id': server.tenant_id,
+                'project_name': project_names.get(server.tenant_id),
+                'user_id': getattr(server, 'user_id', None),
+                'flavor_id': flavor_id,
+                'flavor_name': flavor.name if flavor else None,
+                'vcpus': flavor.vcpus if flavor else None,
+                'ram_mb': flavor.ram if flavor else None,
+                'disk_gb': flavor.disk if flavor else None,
+                'gpu_type': self.openstack_interface.get_flavor_gpu_type(flavor.name) if flavor else None,
+                'image_id': image.get('id') if image else None,
+                'hypervisor': hypervisor,
+                'fixed_ips': fixed_ips,
+                'floating_ips': floating_ips,
+                'created': getattr(server, 'created', None)}
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def iter_server_records(self):
+        """
+        Iterate over the servers of all projects as joined records.
+        """
+        for server in self.openstack_interface.iter_servers(page_size=self.page_size):
+            yield self._server_record(server)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def iter_floating_ip_records(self):
+        """
+        Iterate over the floating IPs of all projects as records.
+        """
+        project_names = self._get_project_names()
+
+        for fip in self.openstack_interface.iter_floating_ips(page_size=self.page_size):
+            project_id = fip.get('project_id', fip.get('tenant_id'))
+            record = {name: fip.get(name) for name, _ in FLOATING_IP_FIELDS}
+            record['project_id'] = project_id
+            record['project_name'] = project_names.get(project_id)
+            yield record
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def iter_image_records(self):
+        """
+        Iterate over the Glance images as records.
+        """
+        project_names = self._get_project_names()
+
+        for image in self.openstack_interface.iter_images(page_size=self.page_size):
+            record = {name: image.get(name) for name, _ in IMAGE_FIELDS}
+            record['owner_name'] = project_names.get(image.get('owner'))
+            yield record
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def iter_flavor_records(self):
+        """
+        Iterate over the flavors, public and private, as records.
+        """
+        for flavor in self._get_flavors().values():
+            yield {'id': flavor.id,
+                   'name': flavor.name,
+                   'vcpus': flavor.vcpus,
+                   'ram_mb': flavor.ram,
+                   'disk_gb': flavor.disk,
+                   'gpu_type': self.openstack_interface.get_flavor_gpu_type(flavor.name)}
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def iter_project_records(self):
+        """
+        Iterate over the Keystone projects as records.
+        """
+        for project in self.openstack_interface.get_projects():
+            enabled = getattr(project, 'enabled', None)
+            yield {'id': project.id,
+                   'name': project.name,
+                   'domain_id': getattr(project, 'domain_id', None),
+                   'enabled': None if enabled is None else str(enabled).lower()}
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _open_writer(self, path, fields, export_format):
+
+        if export_format == 'parquet':
+            return ParquetWriter(path, fields)
+
+        return JsonlWriter(path, fields)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _add_to_aggregates(self, aggregates, record):
+
+        key = (record['project_name'] or record['project_id'], record['gpu_type'])
+        aggregate = aggregates.setdefault(key, {'project': key[0],
+                                                'gpu_type': key[1],
+                                                'servers': 0,
+                                                'vcpus': 0,
+                                                'ram_mb': 0,
+                                                'disk_gb': 0})
+        aggregate['servers'] += 1
+        aggregate['vcpus'] += record['vcpus'] or 0
+        aggregate['ram_mb'] += record['ram_mb'] or 0
+        aggregate['disk_gb'] += record['disk_gb'] or 0
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def export(self,
+               output_dir : str,
+               export_format : str = 'jsonl'):
+        """
+        Write servers, floating IPs, images, flavors and projects to
+        `output_dir` incrementally, plus an aggregates.json file with per
+        project/GPU type totals.
+
+        Args:
+            output_dir (str): The directory the files are written to.
+            export_format (str): 'jsonl' or 'parquet'.
+
+        Returns:
+            list of per project/GPU type aggregates.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {export_format}")
+
+        os.makedirs(output_dir, exist_ok=True)
+        logger.info(f"Exporting inventory to {output_dir} as {export_format}")
+
+        aggregates = {}
+        exports = [ ('servers', SERVER_FIELDS, self.iter_server_records),
+                    ('floating_ips', FLOATING_IP_FIELDS, self.iter_floating_ip_records),
+                    ('images', IMAGE_FIELDS, self.iter_image_records),
+                    ('flavors', FLAVOR_FIELDS, self.iter_flavor_records),
+                    ('projects', PROJECT_FIELDS, self.iter_project_records)]
+
+        for name, fields, iter_records in exports:
+            path = os.path.join(output_dir, f"{name}.{export_format}")
+            writer = self._open_writer(path, fields, export_format)
+            try:
+                for record in iter_records():
+                    writer.write(record)
+                    if name == 'servers':
+                        self._add_to_aggregates(aggregates, record)
+            finally:
+                writer.close()
+            logger.debug(f"Exported {writer.num_records} {name} to {path}")
+
+        aggregate_list = list(aggregates.values())
+        with open(os.path.join(output_dir, 'aggregates.json'), 'w') as f:
+            json.dump(aggregate_list, f, indent=2)
+
+        logger.info(f"Inventory export complete with {len(aggregate_list)} project/GPU type aggregates")
+        return aggregate_list
@@ -3,15 +3,22 @@ import time
 import random
 import logging
 
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pprint import pprint
 
 from novaclient import client as novaclient
 from neutronclient.v2_0 import client as neutronclient
+from neutronclient.common import exceptions as neutron_exceptions
 from glanceclient import client as glanceclient
 from keystoneauth1 import loading
 from keystoneauth1 import session as keystone_session
 from keystoneclient.v3 import client as keystone_client
 
+from .fip_reaper import FloatingIPReaper, DEFAULT_REAP_INTERVAL
+from .userdata import UserdataCache
+from .http_pool import HTTPPool, HTTPPoolConfig, COMPUTE_SERVICE, NETWORK_SERVICE, IMAGE_SERVICE, IDENTITY_SERVICE
+
 # Initialize logger for OpenStack Interface
 logger = logging.getLogger('cloudman.app.openstack')
 
@@ -27,6 +34,7 @@ OS_PROJECT_NAME = 'OS_PROJECT_NAME'
 OS_PROJECT_DOMAIN_NAME = 'OS_PROJECT_DOMAIN_NAME'
 OS_USER_DOMAIN_NAME = 'OS_USER_DOMAIN_NAME'
 OS_CACERT = 'OS_CACERT'
+OS_REGION_NAME = 'OS_REGION_NAME'
 
 NOVA_CREDS_ENV_VARS = [ OS_USERNAME,
                         OS_PASSWORD,
@@ -45,6 +53,39 @@ NOVA_CREDS_KEYS = [
     'user_domain_name',
 ]
 
+GPU_EXTRA_SPECS = { 'a100-80':{"aggregate_instance_extra_specs":"gpu56='true'",
+                                "pci_passthrough:alias":"gpu56:1"},
+                     'a100-40':{"aggregate_instance_extra_specs":"gpu2='true'",
+                                "pci_passthrough:alias":"gpu2:1"},
+                     'v100':{"pci_passthrough:alias":"gpu:1"},
+                     '1080ti':{"pci_passthrough:alias":"gtx1080:1"},
+                     'mi210':{"aggregate_instance_extra_specs":"mi210='true'",
+                              "pci_passthrough:alias":"mi210:1"},
+                     'l40s':{"pci_passthrough:alias":"l40s:1"},
+                     'h200':{"pci_passthrough:alias":"h200:1"}}
+
+DEFAULT_TEARDOWN_WORKERS = 8
+
+# number of items requested per page by the iter_* listing methods
+DEFAULT_PAGE_SIZE = 500
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+@dataclass
+class TeardownResult:
+    """
+    The outcome of tearing down a single VM.
+    """
+    vm_id : str
+    vm_name : str
+    released_fips : list = field(default_factory=list)
+    deleted : bool = False
+    error : Exception = None
+
+    @property
+    def ok(self):
+        return self.error is None
+
 # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
 class OpenStackInterface:
@@ -52,24 +93,45 @@ class OpenStackInterface:
     def __init__(self,
                  vm_setup_script_path : str = None,
                  external_network_id : str = None,
-                 key_name : str = None):
+                 key_name : str = None,
+                 cloud_config : dict = None,
+                 http_pool_config : HTTPPoolConfig = None):
 
         logger.info("Initializing OpenStackInterface")
         # TODO: add error checking for the script paths
         self.vm_setup_script_path = vm_setup_script_path
         self.key_name = key_name
 
-        # Read the VM setup script file as a bytes object
+        # an explicit cloud config (NOVA_CREDS_KEYS plus optional 'cacert' and
+        # 'region_name') replaces the OS_* environment variables, which lets
+        # several interfaces in one process talk to different clouds/regions
+        self.cloud_config = dict(cloud_config) if cloud_config is not None else None
+        if self.cloud_config is not None:
+            self.region_name = self.cloud_config.get('region_name', None)
+        else:
+            self.region_name = os.environ.get(OS_REGION_NAME, None)
+        logger.debug(f"Region name: {self.region_name}")
+
+        # the VM setup script is kept in the userdata cache alongside any
+        # other scripts added later, see create_vm
+        self.userdata_cache = UserdataCache()
         self.vm_setup_script = None
+        self.vm_setup_script_digest = None
         if self.vm_setup_script_path is not None:
-            logger.debug(f"Loading VM setup script from: {vm_setup_script_path}")
-            with open(self.vm_setup_script_path, 'r') as f:
-                self.vm_setup_script = f.read()
+            self.vm_setup_script_digest = self.userdata_cache.add_script_file(self.vm_setup_script_path)
+            self.vm_setup_script = self.userdata_cache.get_script(self.vm_setup_script_digest)
 
         # set the external network ID
         self.external_network_id = external_network_id
         logger.debug(f"External network ID: {external_network_id}")
 
+        # background floating IP reaper, see start_fip_reaper
+        self.fip_reaper = None
+
+        # the HTTP connection pool is shared by every session this interface
+        # builds, so change_project does not drop the open connections
+        self.http_pool = HTTPPool(http_pool_config)
+
         # initialize the OpenStack session
         logger.info("Initializing OpenStack session")
         self.openstack_session = self.init_openstack_session()
@@ -101,6 +163,16 @@ class OpenStackInterface:
 
         d = {}
 
+        if self.cloud_config is not None:
+            for key in NOVA_CREDS_KEYS:
+                value = self.cloud_config.get(key, None)
+                if value is not None:
+                    d[key] = value
+                else:
+                    raise ValueError(f"Cloud config key {key} is not set.")
+
+            return d
+
         for env_var, key in zip(NOVA_CREDS_ENV_VARS, NOVA_CREDS_KEYS):
             value = os.environ.get(env_var, None)
             if value is not None:
@@ -121,7 +193,48 @@ class OpenStackInterface:
         loader = loading.get_plugin_loader('password')
         auth = loader.load_from_options(**creds)
 
-        return keystone_session.Session(auth=auth,verify=os.environ['OS_CACERT'])
+        return keystone_session.Session(auth=auth,
+                                        session=self.http_pool.session,
+                                        verify=self.get_cacert(),
+                                        timeout=self.http_pool.config.read_timeout)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _get_service_session(self, service_type : str):
+        """
+        Get the session for a service. Services with their own read timeout
+        get a session that shares the auth and HTTP pool of the main one.
+        """
+        timeout = self.http_pool.config.get_read_timeout(service_type)
+        if timeout == self.http_pool.config.read_timeout:
+            return self.openstack_session
+
+        return keystone_session.Session(auth=self.openstack_session.auth,
+                                        session=self.http_pool.session,
+                                        verify=self.get_cacert(),
+                                        timeout=timeout)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_http_pool_metrics(self):
+        """
+        Get the connection pool counters: connections opened, checkouts,
+        checkouts that reused an open connection, and checkouts that waited
+        for a free connection (with the total wait time in seconds).
+        """
+        return self.http_pool.metrics.snapshot()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_cacert(self):
+        """
+        Get the CA certificate used to verify the OpenStack endpoints. A
+        cloud config without 'cacert' verifies against the system CAs.
+        """
+        if self.cloud_config is not None:
+            return self.cloud_config.get('cacert', True)
+
+        return os.environ[OS_CACERT]
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
@@ -130,10 +243,16 @@ class OpenStackInterface:
         Initialize the OpenStack clients.
         """
         if self.openstack_session:
-            self.nova_client = novaclient.Client(NOVA_API_VERSION, session=self.openstack_session)
-            self.glance_client = glanceclient.Client(GLANCE_API_VERSION, session=self.openstack_session)
-            self.neutron_client = neutronclient.Client(session=self.openstack_session)
-            self.ks_client = keystone_client.Client(session=self.openstack_session)
+            self.nova_client = novaclient.Client(NOVA_API_VERSION,
+                                                 session=self._get_service_session(COMPUTE_SERVICE),
+                                                 region_name=self.region_name)
+            self.glance_client = glanceclient.Client(GLANCE_API_VERSION,
+                                                     session=self._get_service_session(IMAGE_SERVICE),
+                                                     region_name=self.region_name)
+            self.neutron_client = neutronclient.Client(session=self._get_service_session(NETWORK_SERVICE),
+                                                       region_name=self.region_name)
+            self.ks_client = keystone_client.Client(session=self._get_service_session(IDENTITY_SERVICE),
+                                                    region_name=self.region_name)
         else:
             raise ValueError("OpenStack session is required to initialize Neutron client.")
 
@@ -191,7 +310,10 @@ class OpenStackInterface:
 
         # after all checks, set the project name in the environment variable
         logger.info(f"Switching to project: {project_name}")
-        self.set_project_name_env_var(project_name)
+        if self.cloud_config is not None:
+            self.cloud_config['project_name'] = project_name
+        else:
+            self.set_project_name_env_var(project_name)
         self.openstack_session = self.init_openstack_session()
         self.initialize_clients()
         logger.debug(f"Successfully switched to project: {project_name}")
@@ -226,7 +348,9 @@ class OpenStackInterface:
         Allocate a floating IP to the ACTIVE PROJECT.
         """
 
-        self._release_all_down_fips()
+        # leave the cleanup to the background reaper when one is running
+        if self.fip_reaper is None or not self.fip_reaper.is_running():
+            self._release_all_down_fips()
 
         body = {"floatingip": {"floating_network_id": self.external_network_id}}
 
@@ -390,25 +514,150 @@ class OpenStackInterface:
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
+    def start_fip_reaper(self,
+                         interval : float = DEFAULT_REAP_INTERVAL,
+                         min_age : float = None):
+        """
+        Start a background thread that releases DOWN, unattached floating IPs
+        across all projects every `interval` seconds, so that allocating a
+        floating IP no longer cleans up inline. Floating IPs younger than
+        `min_age` seconds (default: two intervals) are left alone so that
+        one allocated for an attach in progress is not released.
+        """
+        if self.fip_reaper is None:
+            self.fip_reaper = FloatingIPReaper(self, interval=interval, min_age=min_age)
+
+        self.fip_reaper.start()
+        return self.fip_reaper
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def stop_fip_reaper(self):
+        """
+        Stop the background floating IP reaper if it is running.
+
+        Returns:
+            True if no reaper thread is left running.
+        """
+        if self.fip_reaper is None:
+            return True
+
+        return self.fip_reaper.stop()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _get_vm_fips(self, vm, neutron_client):
+        """
+        Get the floating IPs associated with any port of a VM.
+        """
+        fips = []
+        for port in neutron_client.list_ports(device_id=vm.id)['ports']:
+            fips.extend(neutron_client.list_floatingips(port_id=port['id'])['floatingips'])
+
+        return fips
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _delete_fip(self, fip, neutron_client):
+        """
+        Delete a floating IP, which also disassociates it from its port. A
+        floating IP that is already gone (e.g. released by the reaper) counts
+        as deleted.
+        """
+        try:
+            neutron_client.delete_floatingip(fip['id'])
+            logger.debug(f"Floating IP {fip.get('floating_ip_address')} released")
+        except neutron_exceptions.NotFound:
+            logger.debug(f"Floating IP {fip.get('floating_ip_address')} was already released")
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def delete_vm(self, vm):
+        """
+        Release the floating IPs of a VM, then delete it.
+
+        Unlike detach_fip_from_vm this does not change the active project, it
+        relies on the admin credentials to reach the VM's resources in any
+        project. The clients are read once when the call starts, so a
+        concurrent change_project cannot swap them out mid-teardown.
+
+        Returns:
+            TeardownResult for the VM.
+        """
+        logger.info(f"Deleting VM: {vm.name}")
+        result = TeardownResult(vm_id=vm.id, vm_name=vm.name)
+
+        # snapshot the clients, change_project rebinds the attributes
+        nova_client = self.nova_client
+        neutron_client = self.neutron_client
+
+        try:
+            for fip in self._get_vm_fips(vm, neutron_client):
+                self._delete_fip(fip, neutron_client)
+                result.released_fips.append(fip['floating_ip_address'])
+
+            nova_client.servers.delete(vm.id)
+            result.deleted = True
+            logger.info(f"Successfully deleted VM: {vm.name}")
+        except Exception as e:
+            logger.error(f"Error deleting VM {vm.name}: {str(e)}")
+            result.error = e
+
+        return result
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def teardown_vms(self,
+                     vms : list,
+                     max_workers : int = DEFAULT_TEARDOWN_WORKERS):
+        """
+        Delete several VMs (and release their floating IPs) concurrently.
+
+        Args:
+            vms (list): The VMs to delete.
+            max_workers (int): The maximum number of VMs torn down at once.
+
+        Returns:
+            list of TeardownResult, in the same order as `vms`. A failure for
+            one VM is recorded in its result and does not stop the others.
+        """
+        if max_workers < 1:
+            raise ValueError("max_workers must be at least 1 to tear down VMs.")
+
+        logger.info(f"Tearing down {len(vms)} VMs with up to {max_workers} workers")
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='osi-teardown') as executor:
+            results = list(executor.map(self.delete_vm, vms))
+
+        num_failed = sum(1 for result in results if not result.ok)
+        if num_failed:
+            logger.warning(f"Failed to tear down {num_failed} of {len(vms)} VMs")
+
+        return results
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
     def _get_gpu_extra_specs(self, gpu_type):
         """
         Get the extra specs for a GPU type.
         """
-        gpu_extra_specs = { 'a100-80':{"aggregate_instance_extra_specs":"gpu56='true'",
-                                       "pci_passthrough:alias":"gpu56:1"},
-                            'a100-40':{"aggregate_instance_extra_specs":"gpu2='true'",
-                                       "pci_passthrough:alias":"gpu2:1"},
-                            'v100':{"pci_passthrough:alias":"gpu:1"},
-                            '1080ti':{"pci_passthrough:alias":"gtx1080:1"},
-                            'mi210':{"aggregate_instance_extra_specs":"mi210='true'",
-                                     "pci_passthrough:alias":"mi210:1"},
-                            'l40s':{"pci_passthrough:alias":"l40s:1"},
-                            'h200':{"pci_passthrough:alias":"h200:1"}}
-
-        if gpu_type not in gpu_extra_specs:
+        if gpu_type not in GPU_EXTRA_SPECS:
             raise ValueError(f"Unsupported GPU type: {gpu_type}")
 
-        return gpu_extra_specs[gpu_type]
+        return GPU_EXTRA_SPECS[gpu_type]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_flavor_gpu_type(self, flavor_name : str):
+        """
+        Get the GPU type of a flavor from its name (see create_flavor), or
+        None if the flavor has no GPU.
+        """
+        if not flavor_name:
+            return None
+
+        gpu_type = flavor_name.split('.')[0]
+
+        return gpu_type if gpu_type in GPU_EXTRA_SPECS else None
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
@@ -470,6 +719,75 @@ class OpenStackInterface:
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
+    def iter_servers(self,
+                     page_size : int = DEFAULT_PAGE_SIZE,
+                     search_opts : dict = None):
+        """
+        Iterate over the servers of all projects one page at a time, so that
+        only a single page is held in memory.
+        """
+        if search_opts is None:
+            search_opts = {'all_tenants': True}
+
+        marker = None
+        while True:
+            page = self.nova_client.servers.list(search_opts=search_opts,
+                                                 marker=marker,
+                                                 limit=page_size)
+            # Nova may cap the page below page_size (osapi_max_limit), so
+            # only an empty page marks the end of the listing
+            if not page:
+                return
+
+            yield from page
+            marker = page[-1].id
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def iter_flavors(self,
+                     page_size : int = DEFAULT_PAGE_SIZE,
+                     is_public : bool = None):
+        """
+        Iterate over the flavors one page at a time. By default both public
+        and private flavors are listed.
+        """
+        marker = None
+        while True:
+            page = self.nova_client.flavors.list(is_public=is_public,
+                                                 marker=marker,
+                                                 limit=page_size)
+            # Nova may cap the page below page_size (osapi_max_limit), so
+            # only an empty page marks the end of the listing
+            if not page:
+                return
+
+            yield from page
+            marker = page[-1].id
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def iter_floating_ips(self,
+                          page_size : int = DEFAULT_PAGE_SIZE,
+                          **filters):
+        """
+        Iterate over the floating IPs one page at a time.
+        """
+        pages = self.neutron_client.list_floatingips(retrieve_all=False,
+                                                     limit=page_size,
+                                                     **filters)
+        for page in pages:
+            yield from page['floatingips']
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def iter_images(self, page_size : int = DEFAULT_PAGE_SIZE):
+        """
+        Iterate over the Glance images one page at a time.
+        """
+        return self.glance_client.images.list(page_size=page_size)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
     def get_vm(self, vm_name=None):
         """
         Get a VM by its name.
@@ -478,7 +796,7 @@ class OpenStackInterface:
             raise ValueError("VM name must be provided to get the VM.")
 
         logger.debug(f"Looking up VM by name: {vm_name}")
-        for server in self.nova_client.servers.list(search_opts={'all_tenants': True}):
+        for server in self.iter_servers():
             if server.name == vm_name:
                 logger.debug(f"VM found: {vm_name}")
                 return server
@@ -516,11 +834,7 @@ class OpenStackInterface:
         Get the list of images from the Glance client.
         """
         logger.debug("Fetching OS image list from Glance")
-        glance_images = self.glance_client.images.list()
-        image_list = []
-
-        for image in glance_images:
-            image_list.append(image['name'])
+        image_list = [image['name'] for image in self.iter_images()]
 
         logger.debug(f"Retrieved {len(image_list)} images from Glance")
         return image_list
@@ -553,9 +867,7 @@ class OpenStackInterface:
                               floating_ip_address : str):
 
         logger.debug(f"Looking up VM by floating IP: {floating_ip_address}")
-        servers = self.nova_client.servers.list(search_opts={'all_tenants': True})
-
-        for server in servers:
+        for server in self.iter_servers():
             addresses = server.addresses
             for network in addresses.values():
                 for addr in network:
@@ -572,7 +884,7 @@ class OpenStackInterface:
         """
         Get the list of flavors from the Nova client.
         """
-        return self.nova_client.flavors.list()
+        return list(self.iter_flavors(is_public=True))
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
@@ -587,8 +899,7 @@ class OpenStackInterface:
         Returns:
             Image object if found, None otherwise.
         """
-        glance_images = self.glance_client.images.list()
-        image = next((img for img in glance_images if img.name == selected_image_name), None)
+        image = next((img for img in self.iter_images() if img.name == selected_image_name), None)
 
         return image
 
@@ -606,50 +917,124 @@ class OpenStackInterface:
 
     # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
 
+    def add_userdata_script(self,
+                            script : str = None,
+                            script_path : str = None):
+        """
+        Add a VM setup script to the userdata cache.
+
+        Returns:
+            The digest to pass to create_vm/create_vms as a userdata script.
+        """
+        if script_path is not None:
+            return self.userdata_cache.add_script_file(script_path)
+        if script is not None:
+            return self.userdata_cache.add_script(script)
+
+        raise ValueError("Either a script or a script path must be provided to add a userdata script.")
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _build_userdata(self,
+                        userdata_scripts,
+                        hostname,
+                        project_name,
+                        user_name):
+        """
+        Build the userdata of a VM, defaulting to the VM setup script.
+        """
+        if userdata_scripts is None:
+            if self.vm_setup_script_digest is None:
+                return None
+            userdata_scripts = [self.vm_setup_script_digest]
+
+        return self.userdata_cache.build(userdata_scripts,
+                                         hostname=hostname,
+                                         project_name=project_name,
+                                         user_name=user_name)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _wait_for_vm_active(self, vm, hostname):
+        """
+        Poll a VM until it is ACTIVE, raising a ValueError if it enters ERROR.
+        """
+        while vm.status != 'ACTIVE':
+            logger.debug(f"Waiting for VM {hostname} to become ACTIVE. Current status: {vm.status}")
+            time.sleep(1)
+            vm = self.nova_client.servers.get(vm.id)
+            if vm.status == 'ERROR':
+                fault_info = getattr(vm, 'fault', None)
+                if fault_info:
+                    fault_code = fault_info.get('code', 'Unknown')
+                    fault_message = fault_info.get('message', 'No message available')
+                    fault_details = fault_info.get('details', '')
+                    error_msg = f"Failed to create VM: VM entered ERROR state. Fault code: {fault_code}, Message: {fault_message}"
+                    if fault_details:
+                        logger.error(f"{error_msg}\nDetails: {fault_details}")
+                    else:
+                        logger.error(error_msg)
+                else:
+                    error_msg = f"Failed to create VM: VM entered ERROR state (no fault details available)."
+                    logger.error(error_msg)
+                raise ValueError(error_msg)
+
+        logger.info(f"VM {hostname} is now ACTIVE")
+        return vm
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _request_vm(self,
+                    project_name,
+                    hostname,
+                    flavour,
+                    image,
+                    networks,
+                    user_name,
+                    userdata_scripts):
+        """
+        Ask Nova to create a VM in the ACTIVE PROJECT without waiting for it.
+        """
+        userdata = self._build_userdata(userdata_scripts,
+                                        hostname=hostname,
+                                        project_name=project_name,
+                                        user_name=user_name)
+
+        logger.debug(f"Requesting VM creation from Nova: hostname={hostname}, image={image.name if hasattr(image, 'name') else image}")
+        return self.nova_client.servers.create( name=hostname,
+                                                image=image,
+                                                flavor=flavour,
+                                                key_name=self.key_name,
+                                                nics=networks,
+                                                userdata=userdata)
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
     def create_vm(self,
                   project_name : str,
                   hostname : str,
                   flavour,
                   image,
-                  networks : list):
+                  networks : list,
+                  user_name : str = None,
+                  userdata_scripts : list = None):
+        """
+        Create a VM and wait for it to become ACTIVE.
 
+        The userdata is built from `userdata_scripts` (digests from
+        add_userdata_script), or from the VM setup script if none are given,
+        with ${hostname}, ${project_name} and ${user_name} filled in.
+        """
         logger.info(f"Creating VM: hostname={hostname}, project={project_name}, flavor={flavour.name}")
         self.change_project(project_name=project_name)
 
         # create the VM using the Nova client
         try:
-            logger.debug(f"Requesting VM creation from Nova: hostname={hostname}, image={image.name if hasattr(image, 'name') else image}")
-            vm = self.nova_client.servers.create(   name=hostname,
-                                                    image=image,
-                                                    flavor=flavour,
-                                                    key_name=self.key_name,
-                                                    nics=networks,
-                                                    userdata=self.vm_setup_script)
-
+            vm = self._request_vm(project_name, hostname, flavour, image, networks,
+                                  user_name, userdata_scripts)
 
             # wait for the VM to become ACTIVE
-            while vm.status != 'ACTIVE':
-                logger.debug(f"Waiting for VM {hostname} to become ACTIVE. Current status: {vm.status}")
-                time.sleep(1)
-                vm = self.nova_client.servers.get(vm.id)
-                if vm.status == 'ERROR':
-                    fault_info = getattr(vm, 'fault', None)
-                    if fault_info:
-                        fault_code = fault_info.get('code', 'Unknown')
-                        fault_message = fault_info.get('message', 'No message available')
-                        fault_details = fault_info.get('details', '')
-                        error_msg = f"Failed to create VM: VM entered ERROR state. Fault code: {fault_code}, Message: {fault_message}"
-                        if fault_details:
-                            logger.error(f"{error_msg}\nDetails: {fault_details}")
-                        else:
-                            logger.error(error_msg)
-                    else:
-                        error_msg = f"Failed to create VM: VM entered ERROR state (no fault details available)."
-                        logger.error(error_msg)
-                    raise ValueError(error_msg)
-
-            logger.info(f"VM {hostname} is now ACTIVE")
-            return vm
+            return self._wait_for_vm_active(vm, hostname)
 
         except novaclient.exceptions.Forbidden as e:
             raise ValueError(f"Failed to create VM: Permission denied to create VM in project '{self.get_creds()}': {e}")
@@ -657,6 +1042,40 @@ class OpenStackInterface:
         except Exception as e:
             raise ValueError(f"Failed to create VM:{type(e).__name__}:{e}")
 
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def create_vms(self,
+                   project_name : str,
+                   hostnames : list,
+                   flavour,
+                   image,
+                   networks : list,
+                   user_name : str = None,
+                   userdata_scripts : list = None):
+        """
+        Create several VMs in one project. All of them are requested from
+        Nova before waiting for any to become ACTIVE, and userdata that does
+        not depend on the hostname is built once and reused.
+
+        Returns:
+            list of VMs, in the same order as `hostnames`.
+        """
+        logger.info(f"Creating {len(hostnames)} VMs: project={project_name}, flavor={flavour.name}")
+        self.change_project(project_name=project_name)
+
+        try:
+            vms = [self._request_vm(project_name, hostname, flavour, image, networks,
+                                    user_name, userdata_scripts)
+                   for hostname in hostnames]
+
+            return [self._wait_for_vm_active(vm, hostname) for vm, hostname in zip(vms, hostnames)]
+
+        except novaclient.exceptions.Forbidden as e:
+            raise ValueError(f"Failed to create VMs: Permission denied to create VMs in project '{self.get_creds()}': {e}")
+
+        except Exception as e:
+            raise ValueError(f"Failed to create VMs:{type(e).__name__}:{e}")
+
 
 # =================================================================================================
 
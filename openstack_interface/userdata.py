@@ -0,0 +1,196 @@
+import io
+import re
+import gzip
+import hashlib
+import logging
+import threading
+
+from collections import OrderedDict
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+
+# Initialize logger for OpenStack Interface
+logger = logging.getLogger('cloudman.app.openstack')
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+# Nova rejects userdata larger than this once it is base64 encoded
+NOVA_USERDATA_LIMIT = 65535  # bytes
+
+# number of built payloads kept, least recently used are dropped first
+USERDATA_PAYLOAD_CACHE_SIZE = 256
+
+# template variables a script may use, e.g. ${hostname}
+USERDATA_TEMPLATE_VARS = ['hostname', 'project_name', 'user_name']
+
+# only the braced form of the known variables is substituted, so shell
+# syntax such as $HOME, ${PATH} or $$ passes through untouched
+USERDATA_TEMPLATE_PATTERN = re.compile(r'\$\{(' + '|'.join(USERDATA_TEMPLATE_VARS) + r')\}')
+
+# cloud-init part types, keyed by the first line of the script
+CLOUD_INIT_PART_TYPES = {   '#cloud-config': 'cloud-config',
+                            '#include': 'x-include-url',
+                            '#cloud-boothook': 'cloud-boothook',
+                            '#!': 'x-shellscript'}
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class UserdataCache:
+    """
+    A content-addressed store of VM setup scripts that builds gzip'd
+    cloud-init MIME multipart userdata from them.
+
+    Scripts may use the ${hostname}, ${project_name} and ${user_name}
+    placeholders. Built payloads are cached by the scripts and the values
+    of the variables they actually use, so a script without variables is
+    rendered, packed and compressed once and then reused for every VM.
+    """
+
+    def __init__(self, max_payloads : int = USERDATA_PAYLOAD_CACHE_SIZE):
+
+        # digest -> script text
+        self._scripts = {}
+        # digest -> template variables used by the script
+        self._script_vars = {}
+        # (digests, variable values) -> gzip'd payload
+        self._payloads = OrderedDict()
+        self.max_payloads = max_payloads
+        self._lock = threading.Lock()
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def add_script(self, script : str):
+        """
+        Add a script to the cache.
+
+        Returns:
+            The SHA-256 digest that identifies the script.
+        """
+        digest = hashlib.sha256(script.encode('utf-8')).hexdigest()
+
+        used_vars = set(USERDATA_TEMPLATE_PATTERN.findall(script))
+
+        with self._lock:
+            if digest not in self._scripts:
+                logger.debug(f"Caching userdata script {digest[:12]}")
+                self._scripts[digest] = script
+                self._script_vars[digest] = used_vars
+
+        return digest
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def add_script_file(self, path : str):
+        """
+        Read a script from a file and add it to the cache.
+
+        Returns:
+            The SHA-256 digest that identifies the script.
+        """
+        logger.debug(f"Loading userdata script from: {path}")
+        with open(path, 'r') as f:
+            return self.add_script(f.read())
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def get_script(self, digest : str):
+
+        if digest not in self._scripts:
+            raise ValueError(f"Userdata script {digest} is not in the cache.")
+
+        return self._scripts[digest]
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def render(self, digest : str, **template_vars):
+        """
+        Render a cached script with the given template variables. Variables
+        that are not given are left in place.
+        """
+        def substitute(match):
+            value = template_vars.get(match.group(1), None)
+            return match.group(0) if value is None else str(value)
+
+        return USERDATA_TEMPLATE_PATTERN.sub(substitute, self.get_script(digest))
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _get_part_type(self, script):
+
+        for prefix, part_type in CLOUD_INIT_PART_TYPES.items():
+            if script.startswith(prefix):
+                return part_type
+
+        return 'x-shellscript'
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def _pack(self, digests, template_vars):
+
+        # a fixed boundary keeps the payload deterministic
+        message = MIMEMultipart(boundary='===============openstack-interface-userdata==')
+        for i, digest in enumerate(digests):
+            script = self.render(digest, **template_vars)
+            part = MIMEText(script, self._get_part_type(script), 'utf-8')
+            part.add_header('Content-Disposition', 'attachment', filename=f"part-{i:03d}")
+            message.attach(part)
+
+        # mtime=0 so that identical userdata compresses to identical bytes;
+        # cloud-init detects and decompresses gzip'd userdata itself
+        buffer = io.BytesIO()
+        with gzip.GzipFile(fileobj=buffer, mode='wb', mtime=0) as f:
+            f.write(message.as_bytes())
+        payload = buffer.getvalue()
+
+        encoded_size = 4 * ((len(payload) + 2) // 3)
+        if encoded_size > NOVA_USERDATA_LIMIT:
+            raise ValueError(f"Userdata is {encoded_size} bytes once base64 encoded, "
+                             f"which exceeds Nova's limit of {NOVA_USERDATA_LIMIT} bytes.")
+
+        return payload
+
+    # ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+    def build(self,
+              digests : list,
+              hostname : str = None,
+              project_name : str = None,
+              user_name : str = None):
+        """
+        Build the gzip'd MIME multipart userdata for a VM from cached scripts.
+
+        Args:
+            digests (list): The scripts to include, in order.
+            hostname, project_name, user_name: Template variable values.
+
+        Returns:
+            The userdata as bytes, ready to pass to Nova.
+        """
+        if not digests:
+            raise ValueError("At least one userdata script must be provided to build userdata.")
+
+        values = {'hostname': hostname, 'project_name': project_name, 'user_name': user_name}
+
+        # only the variables the scripts use are part of the cache key
+        used_vars = set()
+        for digest in digests:
+            self.get_script(digest)
+            used_vars.update(self._script_vars[digest])
+
+        template_vars = {name: values[name] for name in used_vars if values[name] is not None}
+        key = (tuple(digests), tuple(sorted(template_vars.items())))
+
+        with self._lock:
+            payload = self._payloads.get(key)
+            if payload is not None:
+                self._payloads.move_to_end(key)
+
+        if payload is None:
+            payload = self._pack(digests, template_vars)
+            with self._lock:
+                self._payloads[key] = payload
+                while len(self._payloads) > self.max_payloads:
+                    self._payloads.popitem(last=False)
+            logger.debug(f"Built {len(payload)} byte userdata from {len(digests)} scripts")
+
+        return payload
@@ -11,7 +11,8 @@ setup(
                         "python-neutronclient==11.6.0",
                         "python-novaclient==18.10.0",
                         "pytest",],
-    extras_require={'dev': ['pytest']},
+    extras_require={'dev': ['pytest'],
+                    'parquet': ['pyarrow']},
 
     author='Nicholi Shiell',
     description='Interface for OpenStack services',
@@ -0,0 +1,157 @@
+import threading
+
+from types import SimpleNamespace
+
+import pytest
+
+from openstack_interface import FederatedOpenStackInterface
+from openstack_interface import federated_interface
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class FakeRegion:
+    """A stand-in for a per-region OpenStackInterface, configured through its cloud config."""
+
+    def __init__(self,
+                 vm_setup_script_path=None,
+                 external_network_id=None,
+                 key_name=None,
+                 cloud_config=None,
+                 http_pool_config=None):
+
+        if cloud_config.get('broken_init'):
+            raise RuntimeError("auth failed")
+
+        self.external_network_id = external_network_id
+        self.key_name = key_name
+        self.cloud_config = cloud_config
+        self.created = []
+
+        stats = SimpleNamespace(vcpus=100, vcpus_used=cloud_config.get('vcpus_used', 0))
+        self.nova_client = SimpleNamespace(
+            hypervisor_stats=SimpleNamespace(statistics=lambda: stats))
+
+    def _check_up(self):
+        if self.cloud_config.get('down'):
+            raise RuntimeError("region is down")
+
+    def get_vm(self, vm_name=None):
+        self._check_up()
+        if vm_name not in self.cloud_config.get('vm_names', []):
+            raise ValueError(f"VM with name {vm_name} not found.")
+        return SimpleNamespace(name=vm_name)
+
+    def get_os_image_list(self):
+        self._check_up()
+        return self.cloud_config.get('images', [])
+
+    def get_projects(self):
+        self._check_up()
+        return [SimpleNamespace(name='Science')]
+
+    def create_vm(self, project_name, hostname, flavour, image, networks):
+        self.created.append(hostname)
+        return SimpleNamespace(name=hostname)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+@pytest.fixture(autouse=True)
+def fake_regions(monkeypatch):
+
+    monkeypatch.setattr(federated_interface, 'OpenStackInterface', FakeRegion)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def region_threads():
+
+    return [thread for thread in threading.enumerate() if thread.name.startswith('osi-region')]
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_init_routes_config_to_each_region():
+
+    cloud_configs = {'east': {'region_name': 'east'},
+                     'west': {'region_name': 'west'},
+                     'broken': {'broken_init': True}}
+
+    with FederatedOpenStackInterface(cloud_configs,
+                                     external_network_ids={'east': 'ext-east'},
+                                     key_name='admin-key') as federation:
+
+        assert set(federation.regions) == {'east', 'west'}
+        assert set(federation.failed_regions) == {'broken'}
+
+        east = federation.get_region('east')
+        assert east.cloud_config is cloud_configs['east']
+        assert east.external_network_id == 'ext-east'
+        assert east.key_name == 'admin-key'
+        assert federation.get_region('west').external_network_id is None
+
+        with pytest.raises(ValueError):
+            federation.get_region('broken')
+
+    assert region_threads() == []
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_init_shuts_down_workers_when_every_region_fails():
+
+    with pytest.raises(ValueError):
+        FederatedOpenStackInterface({'east': {'broken_init': True},
+                                     'west': {'broken_init': True}})
+
+    assert region_threads() == []
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_fan_out_isolates_region_failures():
+
+    cloud_configs = {'east': {'vm_names': ['vm-0'], 'images': ['ubuntu']},
+                     'west': {'vm_names': ['vm-1'], 'images': ['rocky', 'ubuntu']},
+                     'down': {'down': True}}
+
+    with FederatedOpenStackInterface(cloud_configs) as federation:
+
+        region_name, vm = federation.get_vm(vm_name='vm-1')
+        assert region_name == 'west'
+        assert vm.name == 'vm-1'
+
+        assert federation.get_os_image_list() == ['rocky', 'ubuntu']
+        assert set(federation.get_projects()) == {'east', 'west'}
+        assert set(federation.get_region_latencies()) == {'east', 'west', 'down'}
+
+        # the VM may be in the region that failed, so the error says so
+        with pytest.raises(ValueError, match='lookup failed in: down'):
+            federation.get_vm(vm_name='missing')
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_get_vm_tells_not_found_from_failures():
+
+    with FederatedOpenStackInterface({'east': {}, 'west': {}}) as federation:
+        with pytest.raises(ValueError, match='not found in any region'):
+            federation.get_vm(vm_name='missing')
+
+    with FederatedOpenStackInterface({'east': {'down': True}, 'west': {'down': True}}) as federation:
+        with pytest.raises(ValueError, match='every region failed'):
+            federation.get_vm(vm_name='missing')
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_create_vm_routes_to_region():
+
+    cloud_configs = {'east': {'vcpus_used': 80},
+                     'west': {'vcpus_used': 20}}
+
+    with FederatedOpenStackInterface(cloud_configs) as federation:
+
+        assert federation.get_least_loaded_region() == 'west'
+
+        region_name, vm = federation.create_vm('Science', 'science-0', 'flavor', 'image', [])
+        assert region_name == 'west'
+        assert federation.get_region('west').created == ['science-0']
+
+        region_name, vm = federation.create_vm('Science', 'science-1', 'flavor', 'image', [],
+                                               region_name='east')
+        assert region_name == 'east'
+        assert federation.get_region('east').created == ['science-1']
@@ -0,0 +1,91 @@
+import threading
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from openstack_interface import OpenStackInterface, HTTPPoolConfig
+from openstack_interface.http_pool import HTTPPool, COMPUTE_SERVICE, NETWORK_SERVICE
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'{}'
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+@pytest.fixture
+def server_url():
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), KeepAliveHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    yield f"http://127.0.0.1:{server.server_address[1]}/"
+
+    server.shutdown()
+    server.server_close()
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_pool_reuses_connections(server_url):
+
+    pool = HTTPPool(HTTPPoolConfig(pool_maxsize=2, connect_timeout=5, read_timeout=5))
+
+    for _ in range(5):
+        assert pool.session.get(server_url, timeout=5).status_code == 200
+
+    metrics = pool.metrics.snapshot()
+    assert metrics['opened'] == 1
+    assert metrics['checkouts'] == 5
+    assert metrics['reused'] == 4
+
+    pool.close()
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_pool_records_waits(server_url):
+
+    pool = HTTPPool(HTTPPoolConfig(pool_maxsize=1, pool_block=True))
+
+    threads = [threading.Thread(target=pool.session.get, args=(server_url,)) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    metrics = pool.metrics.snapshot()
+    assert metrics['opened'] == 1
+    assert metrics['checkouts'] == 8
+    assert metrics['waited'] + metrics['reused'] >= 7
+
+    pool.close()
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_service_sessions_share_the_pool():
+
+    interface = OpenStackInterface.__new__(OpenStackInterface)
+    interface.cloud_config = {'cacert': True}
+    interface.http_pool = HTTPPool(HTTPPoolConfig(read_timeout=30,
+                                                  service_timeouts={COMPUTE_SERVICE: 120}))
+    interface.openstack_session = SimpleNamespace(auth=None, timeout=30)
+
+    compute_session = interface._get_service_session(COMPUTE_SERVICE)
+    assert compute_session.timeout == 120
+    assert compute_session.session is interface.http_pool.session
+
+    assert interface._get_service_session(NETWORK_SERVICE) is interface.openstack_session
@@ -0,0 +1,146 @@
+import json
+import os
+import sys
+
+from types import SimpleNamespace
+
+import pytest
+
+from openstack_interface import OpenStackInterface, InventoryExporter
+from openstack_interface.inventory import ParquetWriter, SERVER_FIELDS
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class FakePagedList:
+
+    def __init__(self, items, max_limit=None):
+        self.items = items
+        self.max_limit = max_limit
+        self.num_calls = 0
+
+    def list(self, search_opts=None, is_public=None, marker=None, limit=None):
+        self.num_calls += 1
+        start = 0
+        if marker is not None:
+            start = [item.id for item in self.items].index(marker) + 1
+        if self.max_limit is not None:
+            limit = min(limit, self.max_limit)
+        return self.items[start:start + limit]
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def make_interface():
+
+    flavors = [SimpleNamespace(id='f-gpu', name='l40s.8cpu32gb.200g', vcpus=8, ram=32768, disk=200),
+               SimpleNamespace(id='f-cpu', name='4cpu16gb.100g', vcpus=4, ram=16384, disk=100)]
+
+    servers = []
+    for i in range(5):
+        flavor_id = 'f-gpu' if i < 2 else 'f-cpu'
+        addresses = {'rcs': [{'OS-EXT-IPS:type': 'fixed', 'addr': f"10.0.0.{i}"}]}
+        if i == 0:
+            addresses['rcs'].append({'OS-EXT-IPS:type': 'floating', 'addr': '192.168.1.100'})
+        servers.append(SimpleNamespace(**{'id': f"vm-{i}",
+                                          'name': f"science-{i}",
+                                          'status': 'ACTIVE',
+                                          'tenant_id': 'p-science',
+                                          'flavor': {'id': flavor_id},
+                                          'image': {'id': 'img-0'},
+                                          'addresses': addresses,
+                                          'OS-EXT-SRV-ATTR:host': 'gpu-node-1.maas'}))
+
+    interface = OpenStackInterface.__new__(OpenStackInterface)
+    interface.project_list = [SimpleNamespace(id='p-science', name='Science')]
+    interface.nova_client = SimpleNamespace(
+        servers=FakePagedList(servers),
+        flavors=FakePagedList(flavors))
+    interface.neutron_client = SimpleNamespace(
+        list_floatingips=lambda retrieve_all=True, limit=None: iter([{'floatingips': [
+            {'id': 'fip-0', 'floating_ip_address': '192.168.1.100', 'status': 'ACTIVE',
+             'project_id': 'p-science'}]}]))
+    interface.glance_client = SimpleNamespace(
+        images=SimpleNamespace(list=lambda page_size=None: iter([{'id': 'img-0', 'name': 'Ubuntu', 'owner': 'p-science'}])))
+
+    return interface
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_iter_servers_pages():
+
+    interface = make_interface()
+
+    names = [server.name for server in interface.iter_servers(page_size=2)]
+
+    assert names == [f"science-{i}" for i in range(5)]
+    assert interface.nova_client.servers.num_calls == 4
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_iter_servers_pages_past_nova_max_limit():
+
+    interface = make_interface()
+    interface.nova_client.servers.max_limit = 2
+
+    names = [server.name for server in interface.iter_servers(page_size=1000)]
+
+    assert names == [f"science-{i}" for i in range(5)]
+    assert interface.get_vm(vm_name='science-4').id == 'vm-4'
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_export_jsonl(tmp_path):
+
+    exporter = InventoryExporter(make_interface(), page_size=2)
+    aggregates = exporter.export(str(tmp_path))
+
+    with open(os.path.join(tmp_path, 'servers.jsonl')) as f:
+        servers = [json.loads(line) for line in f]
+
+    assert len(servers) == 5
+    assert servers[0]['project_name'] == 'Science'
+    assert servers[0]['gpu_type'] == 'l40s'
+    assert servers[0]['floating_ips'] == ['192.168.1.100']
+    assert servers[0]['hypervisor'] == 'gpu-node-1'
+
+    totals = {aggregate['gpu_type']: aggregate for aggregate in aggregates}
+    assert totals['l40s']['servers'] == 2
+    assert totals[None]['vcpus'] == 12
+
+    assert os.path.exists(os.path.join(tmp_path, 'floating_ips.jsonl'))
+    assert os.path.exists(os.path.join(tmp_path, 'images.jsonl'))
+
+    with open(os.path.join(tmp_path, 'flavors.jsonl')) as f:
+        flavors = [json.loads(line) for line in f]
+    assert [flavor['gpu_type'] for flavor in flavors] == ['l40s', None]
+
+    with open(os.path.join(tmp_path, 'projects.jsonl')) as f:
+        projects = [json.loads(line) for line in f]
+    assert projects[0]['name'] == 'Science'
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_export_parquet(tmp_path):
+
+    pyarrow_parquet = pytest.importorskip('pyarrow.parquet')
+
+    exporter = InventoryExporter(make_interface(), page_size=2)
+    exporter.export(str(tmp_path), export_format='parquet')
+
+    table = pyarrow_parquet.read_table(os.path.join(tmp_path, 'servers.parquet'))
+    servers = table.to_pylist()
+
+    assert len(servers) == 5
+    assert servers[0]['gpu_type'] == 'l40s'
+    assert servers[0]['floating_ips'] == ['192.168.1.100']
+    assert servers[4]['vcpus'] == 4
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_parquet_writer_requires_pyarrow(tmp_path, monkeypatch):
+
+    # a None entry in sys.modules makes the import raise ImportError
+    monkeypatch.setitem(sys.modules, 'pyarrow', None)
+    monkeypatch.setitem(sys.modules, 'pyarrow.parquet', None)
+
+    with pytest.raises(ImportError, match='pip install OpenStackInterface\\[parquet\\]'):
+        ParquetWriter(os.path.join(tmp_path, 'servers.parquet'), SERVER_FIELDS)
@@ -1,4 +1,11 @@
+import os
+
+from types import SimpleNamespace
+
+import pytest
+
 from openstack_interface import OpenStackInterface
+from openstack_interface import openstack_interface as osi_module
 
 def test_openstack_interface():
     """A simple test function to check if OpenStackInterface can be instantiated."""
@@ -9,5 +16,78 @@ def test_openstack_interface():
         print(f"Failed to instantiate OpenStackInterface: {e}")
 
 
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class FakeClientModule:
+    """Records the keyword arguments every client is built with."""
+
+    def __init__(self, projects=()):
+        self.calls = []
+        self.projects = list(projects)
+
+    def Client(self, *args, **kwargs):
+        self.calls.append(kwargs)
+        return SimpleNamespace(projects=SimpleNamespace(list=lambda: self.projects))
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+@pytest.fixture
+def fake_clients(monkeypatch):
+
+    projects = [SimpleNamespace(id='p-science', name='Science'),
+                SimpleNamespace(id='p-arts', name='Arts')]
+    clients = {'novaclient': FakeClientModule(),
+               'glanceclient': FakeClientModule(),
+               'neutronclient': FakeClientModule(),
+               'keystone_client': FakeClientModule(projects)}
+    for name, module in clients.items():
+        monkeypatch.setattr(osi_module, name, module)
+
+    # the password plugin just echoes the credentials it was loaded with
+    loader = SimpleNamespace(load_from_options=lambda **creds: SimpleNamespace(creds=creds))
+    monkeypatch.setattr(osi_module.loading, 'get_plugin_loader', lambda name: loader)
+
+    return clients
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_cloud_config_replaces_environment(fake_clients, monkeypatch):
+
+    for env_var in osi_module.NOVA_CREDS_ENV_VARS:
+        monkeypatch.delenv(env_var, raising=False)
+
+    cloud_config = {'username': 'admin',
+                    'password': 'secret',
+                    'auth_url': 'https://keystone.example:5000/v3',
+                    'project_name': 'Science',
+                    'project_domain_name': 'Default',
+                    'user_domain_name': 'Default',
+                    'region_name': 'east'}
+
+    interface = OpenStackInterface(cloud_config=cloud_config)
+
+    assert interface.get_creds()['project_name'] == 'Science'
+    assert interface.openstack_session.auth.creds['username'] == 'admin'
+
+    # no 'cacert' in the config means the system CAs, not OS_CACERT
+    assert interface.get_cacert() is True
+
+    # every client is bound to the configured region
+    for module in fake_clients.values():
+        assert module.calls[-1]['region_name'] == 'east'
+
+    interface.change_project(project_name='Arts')
+
+    assert interface.cloud_config['project_name'] == 'Arts'
+    assert interface.openstack_session.auth.creds['project_name'] == 'Arts'
+    assert osi_module.OS_PROJECT_NAME not in os.environ
+
+    # the caller's dict is copied, not mutated
+    assert cloud_config['project_name'] == 'Science'
+
+    with pytest.raises(ValueError):
+        OpenStackInterface(cloud_config={'username': 'admin'})
+
+
 if __name__ == "__main__":
     test_openstack_interface()
\ No newline at end of file
@@ -0,0 +1,172 @@
+import threading
+
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+from neutronclient.common import exceptions as neutron_exceptions
+
+from openstack_interface import OpenStackInterface, FloatingIPReaper
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def timestamp(seconds_ago):
+
+    when = datetime.now(timezone.utc) - timedelta(seconds=seconds_ago)
+    return when.strftime('%Y-%m-%dT%H:%M:%SZ')
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class FakeNeutron:
+
+    def __init__(self, floating_ips, ports):
+        self.floating_ips = floating_ips
+        self.ports = ports
+        self.created = 0
+
+    def list_ports(self, device_id):
+        return {'ports': [port for port in self.ports if port['device_id'] == device_id]}
+
+    def list_floatingips(self, **filters):
+        fips = [fip for fip in self.floating_ips
+                if all(fip.get(key) == value for key, value in filters.items())]
+        return {'floatingips': fips}
+
+    def create_floatingip(self, body):
+        self.created += 1
+        return {'floatingip': {'id': f"new-{self.created}", 'floating_ip_address': '10.0.1.1'}}
+
+    def delete_floatingip(self, fip_id):
+        if fip_id not in [fip['id'] for fip in self.floating_ips]:
+            raise neutron_exceptions.NotFound()
+        self.floating_ips = [fip for fip in self.floating_ips if fip['id'] != fip_id]
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+class FakeServers:
+
+    def __init__(self, fail_ids=()):
+        self.deleted = []
+        self.fail_ids = fail_ids
+
+    def delete(self, vm_id):
+        if vm_id in self.fail_ids:
+            raise RuntimeError("delete refused")
+        self.deleted.append(vm_id)
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def make_interface(floating_ips, ports, fail_ids=()):
+
+    interface = OpenStackInterface.__new__(OpenStackInterface)
+    interface.fip_reaper = None
+    interface.external_network_id = 'ext-net'
+    interface.neutron_client = FakeNeutron(floating_ips, ports)
+    interface.nova_client = SimpleNamespace(servers=FakeServers(fail_ids))
+
+    return interface
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_teardown_vms():
+
+    floating_ips = [{'id': 'fip-0', 'floating_ip_address': '10.0.0.1', 'port_id': 'port-0', 'status': 'ACTIVE'},
+                    {'id': 'fip-1', 'floating_ip_address': '10.0.0.2', 'port_id': 'port-1', 'status': 'ACTIVE'}]
+    ports = [{'id': 'port-0', 'device_id': 'vm-0'},
+             {'id': 'port-1', 'device_id': 'vm-1'}]
+    interface = make_interface(floating_ips, ports, fail_ids=('vm-2',))
+
+    vms = [SimpleNamespace(id=f"vm-{i}", name=f"test-{i}") for i in range(3)]
+    results = interface.teardown_vms(vms, max_workers=2)
+
+    assert [result.vm_id for result in results] == ['vm-0', 'vm-1', 'vm-2']
+    assert results[0].released_fips == ['10.0.0.1']
+    assert results[1].released_fips == ['10.0.0.2']
+    assert results[0].deleted and results[1].deleted
+    assert not results[2].ok and not results[2].deleted
+    assert interface.neutron_client.floating_ips == []
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_delete_vm_survives_already_released_fip():
+
+    fip = {'id': 'fip-0', 'floating_ip_address': '10.0.0.1', 'port_id': 'port-0', 'status': 'ACTIVE'}
+    interface = make_interface([fip], [{'id': 'port-0', 'device_id': 'vm-0'}])
+
+    # the floating IP is listed, then released by someone else before the delete
+    interface._get_vm_fips = lambda vm, neutron_client: [fip]
+    interface.neutron_client.floating_ips = []
+
+    result = interface.delete_vm(SimpleNamespace(id='vm-0', name='test-0'))
+
+    assert result.ok and result.deleted
+    assert interface.nova_client.servers.deleted == ['vm-0']
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_fip_reaper_sweep_skips_young_fips():
+
+    floating_ips = [{'id': 'fip-old', 'floating_ip_address': '10.0.0.1', 'port_id': None, 'status': 'DOWN',
+                     'created_at': timestamp(3600), 'updated_at': timestamp(3600)},
+                    {'id': 'fip-fresh', 'floating_ip_address': '10.0.0.2', 'port_id': None, 'status': 'DOWN',
+                     'created_at': timestamp(5), 'updated_at': timestamp(5)},
+                    {'id': 'fip-touched', 'floating_ip_address': '10.0.0.3', 'port_id': None, 'status': 'DOWN',
+                     'created_at': timestamp(3600), 'updated_at': timestamp(5)},
+                    {'id': 'fip-attached', 'floating_ip_address': '10.0.0.4', 'port_id': 'port-1', 'status': 'DOWN',
+                     'created_at': timestamp(3600)},
+                    {'id': 'fip-active', 'floating_ip_address': '10.0.0.5', 'port_id': None, 'status': 'ACTIVE',
+                     'created_at': timestamp(3600)},
+                    {'id': 'fip-no-timestamps', 'floating_ip_address': '10.0.0.6', 'port_id': None, 'status': 'DOWN'}]
+    interface = make_interface(floating_ips, [])
+
+    reaper = FloatingIPReaper(interface, interval=60)
+    assert reaper.min_age == 120
+    assert reaper.sweep() == 1
+
+    remaining = [fip['id'] for fip in interface.neutron_client.floating_ips]
+    assert remaining == ['fip-fresh', 'fip-touched', 'fip-attached', 'fip-active', 'fip-no-timestamps']
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_allocate_fip_skips_inline_cleanup_while_reaper_runs():
+
+    interface = make_interface([], [])
+
+    calls = []
+    interface._release_all_down_fips = lambda: calls.append('inline')
+
+    reaper = interface.start_fip_reaper(interval=60)
+    try:
+        assert reaper.is_running()
+        interface._allocate_fip()
+        assert calls == []
+    finally:
+        assert interface.stop_fip_reaper() is True
+
+    assert not reaper.is_running()
+    interface._allocate_fip()
+    assert calls == ['inline']
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_fip_reaper_restart_after_timed_out_stop():
+
+    interface = make_interface([], [])
+
+    release = threading.Event()
+    reaper = FloatingIPReaper(interface, interval=60)
+    reaper.sweep = lambda: release.wait(5)
+
+    reaper.start()
+    first_thread = reaper._thread
+
+    # the sweep is still blocked, so the join times out
+    assert reaper.stop(timeout=0.05) is False
+    assert reaper.is_running()
+
+    # starting again must not create a second reaper thread
+    reaper.start()
+    assert reaper._thread is first_thread
+
+    release.set()
+    assert reaper.stop(timeout=5) is True
+    assert not first_thread.is_alive()
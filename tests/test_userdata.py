@@ -0,0 +1,62 @@
+import base64
+import email
+import gzip
+import os
+
+import pytest
+
+from openstack_interface import UserdataCache
+from openstack_interface.userdata import NOVA_USERDATA_LIMIT
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def unpack(payload):
+
+    message = email.message_from_bytes(gzip.decompress(payload))
+    return [(part.get_content_type(), part.get_payload(decode=True).decode('utf-8'))
+            for part in message.get_payload()]
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_build_renders_template_into_mime_parts():
+
+    cache = UserdataCache()
+    script = cache.add_script("#!/bin/bash\necho ${hostname} ${user_name} $HOME $$\n")
+    config = cache.add_script("#cloud-config\npackages: [htop]\n")
+
+    parts = unpack(cache.build([script, config], hostname='science-0', user_name='smith'))
+
+    assert parts[0] == ('text/x-shellscript', "#!/bin/bash\necho science-0 smith $HOME $$\n")
+    assert parts[1][0] == 'text/cloud-config'
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_build_reuses_payloads():
+
+    cache = UserdataCache()
+    static = cache.add_script("#!/bin/bash\necho hello\n")
+    templated = cache.add_script("#!/bin/bash\nhostnamectl set-hostname ${hostname}\n")
+
+    # the same script content maps to the same digest
+    assert cache.add_script("#!/bin/bash\necho hello\n") == static
+
+    # a script without variables is built once for every VM
+    assert cache.build([static], hostname='vm-0') is cache.build([static], hostname='vm-1')
+
+    assert cache.build([templated], hostname='vm-0') != cache.build([templated], hostname='vm-1')
+
+# ~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~~
+
+def test_build_enforces_nova_size_limit():
+
+    cache = UserdataCache()
+
+    # random data does not compress, so it overflows the limit once encoded
+    noise = base64.b64encode(os.urandom(NOVA_USERDATA_LIMIT)).decode('ascii')
+    digest = cache.add_script(f"#!/bin/bash\n# {noise}\n")
+
+    with pytest.raises(ValueError):
+        cache.build([digest])
+
+    with pytest.raises(ValueError):
+        cache.build(['not-a-digest'])